@@ -1,9 +1,57 @@
 import os
 import sys
+import errno
 import logging
 import argparse
 import fnmatch
+import re
+import stat
+import tempfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from itertools import islice
 from pathlib import Path
+from typing import Iterator, NamedTuple, Optional
+
+try:
+    import liburing
+except ImportError:
+    liburing = None
+
+# Entry names that are always skipped, checked before any ignore pattern
+ALWAYS_IGNORE = frozenset({'.git'})
+
+# Ignore patterns of the form "*.ext" are matched by a set lookup instead of a regex
+EXTENSION_PATTERN = re.compile(r'^\*\.[A-Za-z0-9_]+$')
+
+# Characters that make a glob pattern (or one of its path segments) more than a literal string
+GLOB_CHARACTERS = re.compile(r'[*?[]')
+
+# Chunk size used when streaming input files into the output file
+COPY_BUFFER_SIZE = 1 << 16
+
+# Buffer size of the output file, large enough to coalesce many small header and file writes
+OUTPUT_BUFFER_SIZE = 1 << 20
+
+# Number of threads reading input files ahead of the writer, and how many files they may read ahead
+READ_WORKERS   = 8
+READ_AHEAD_MAX = 4 * READ_WORKERS
+
+# Number of files whose open, read and close calls are each submitted together in io_uring mode
+IO_URING_BATCH_SIZE = 32
+
+# Maximum number of bytes moved per os.copy_file_range() / os.sendfile() call
+KERNEL_COPY_SIZE = 1 << 20
+
+# Errors meaning a kernel copy is not supported for this pair of files, rather than an I/O failure
+KERNEL_COPY_UNSUPPORTED_ERRORS = frozenset({
+    errno.EXDEV, errno.EINVAL, errno.ENOSYS, errno.EOPNOTSUPP, errno.ENOTSUP, errno.ENOTSOCK, errno.EBADF,
+})
+
+# Access pattern hints for posix_fadvise(), None where it is not available (e.g. Windows and macOS)
+FADVISE_SEQUENTIAL = getattr(os, 'POSIX_FADV_SEQUENTIAL', None)
+FADVISE_DONTNEED   = getattr(os, 'POSIX_FADV_DONTNEED',   None)
 
 def parse_args():
     parser = argparse.ArgumentParser(description='Extract code with ignore functionality.')
@@ -11,59 +59,477 @@ def parse_args():
     parser.add_argument('-out',    '--output_path',      help='Output file path'                           )
     parser.add_argument('-ignore', '--ignore_file_path', help='Path to ignore file'                        )
     parser.add_argument('-v',      '--verbose',          help='Enable verbose logging', action='store_true')
+    parser.add_argument('-uring',  '--io_uring',         help='Read files with io_uring (Linux, needs liburing)', action='store_true')
     return parser.parse_args()
 
-def should_ignore(path: str, ignore_patterns: list, output_file_path: str, root_path: str) -> bool:
+class IgnoreRules(NamedTuple):
     """
-    Determine if a given path should be ignored.
+    Ignore patterns split by how cheaply they can be matched, see compile_ignore_patterns().
+
+    Attributes:
+        literals (frozenset): Patterns without glob characters, matched by exact relative path.
+        extensions (frozenset): File extensions (e.g. ".log") from "*.ext" patterns.
+        by_top_dir (dict): Compiled unions of the patterns starting with a literal directory, keyed by it.
+        compiled (Optional[re.Pattern]): Compiled union of all remaining patterns, or None if there are none.
+    """
+    literals:   frozenset
+    extensions: frozenset
+    by_top_dir: dict
+    compiled:   Optional[re.Pattern]
+
+def compile_glob_union(patterns: list) -> Optional[re.Pattern]:
+    """
+    Compile a list of glob patterns into a single regular expression.
+
+    Args:
+        patterns (list): A list of case normalized glob patterns.
+
+    Returns:
+        Optional[re.Pattern]: The compiled union of all patterns, or None if there are none. It must be
+        used with fullmatch(), which anchors every alternative at both ends of the path.
+    """
+    if not patterns:
+        return None
+    return re.compile('|'.join(f'(?:{fnmatch.translate(p)})' for p in patterns))
+
+def compile_ignore_patterns(ignore_patterns: list) -> IgnoreRules:
+    """
+    Split glob patterns into groups that can each be matched with as little work as possible.
+
+    A pattern whose first path segment is literal (e.g. "build/*") can only match paths below that
+    directory, so it is only tried against those paths instead of against every path.
 
     Args:
-        path (str): The file or directory path to check.
         ignore_patterns (list): A list of glob patterns to ignore.
-        output_file_path (str): The absolute path to the output file.
-        root_path (str): The root directory path.
+
+    Returns:
+        IgnoreRules: The grouped and compiled patterns.
+    """
+    literals, extensions, by_top_dir, remaining = set(), set(), {}, []
+    # Normalize case the same way fnmatch.fnmatch does, so matching stays case-insensitive on Windows.
+    # Repeated patterns are dropped so each one is translated and compiled only once.
+    for pattern in dict.fromkeys(map(os.path.normcase, ignore_patterns)):
+        top_dir, sep, _ = pattern.partition(os.sep)
+        if EXTENSION_PATTERN.match(pattern):
+            extensions.add(pattern[1:])
+        elif not GLOB_CHARACTERS.search(pattern):
+            literals.add(pattern)
+        elif sep and not GLOB_CHARACTERS.search(top_dir):
+            by_top_dir.setdefault(top_dir, []).append(pattern)
+        else:
+            remaining.append(pattern)
+    return IgnoreRules(
+        literals   = frozenset(literals),
+        extensions = frozenset(extensions),
+        by_top_dir = {top_dir: compile_glob_union(patterns) for top_dir, patterns in by_top_dir.items()},
+        compiled   = compile_glob_union(remaining),
+    )
+
+def should_ignore(path: str, relative_path: str, rules: IgnoreRules, prefixed: Optional[re.Pattern], output_paths: frozenset) -> bool:
+    """
+    Determine if a given path should be ignored.
+
+    Args:
+        path (str): The absolute file or directory path to check.
+        relative_path (str): The same path relative to the root directory.
+        rules (IgnoreRules): The ignore patterns, see compile_ignore_patterns().
+        prefixed (Optional[re.Pattern]): The rules.by_top_dir entry for the path's top level directory, if any.
+        output_paths (frozenset): The absolute paths of the output file and its temporary file.
 
     Returns:
         bool: True if the path should be ignored, False otherwise.
     """
-    # Always ignore the output file
-    if os.path.abspath(path) == os.path.abspath(output_file_path):
+    # Always ignore the output file. All paths are already absolute, see main().
+    if path in output_paths:
+        return True
+    relative_path = os.path.normcase(relative_path)
+    if relative_path in rules.literals:
+        return True
+    # Check ignored extensions. Slicing from the last dot rather than using splitext() keeps
+    # dotfiles like ".log" matching "*.log", the same as fnmatch does.
+    if relative_path[relative_path.rfind('.'):] in rules.extensions:
         return True
-    # Always ignore .git directories
-    relative_path = os.path.relpath(path, root_path)
-    if '.git' in relative_path.split(os.sep):
+    # Check the patterns for this path's top level directory, then the rest
+    if prefixed and prefixed.fullmatch(relative_path):
+        return True
+    if rules.compiled and rules.compiled.fullmatch(relative_path):
         return True
-    # Check ignore patterns
-    for pattern in ignore_patterns:
-        if fnmatch.fnmatch(relative_path, pattern):
-            return True
     return False
 
-def write_files_recursively(root_path: str, output_file, ignore_patterns: list, output_file_path: str) -> None:
+def fadvise(fd: int, advice: Optional[int]) -> None:
+    """
+    Tell the kernel how a whole file will be accessed, if the platform supports it.
+
+    Args:
+        fd (int): The file descriptor the advice applies to.
+        advice (Optional[int]): One of the FADVISE_* constants.
+    """
+    if advice is None:
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, advice)
+    except OSError:
+        # Only a hint, e.g. not supported for pipes or some filesystems
+        pass
+
+def read_file_head(file_path: str) -> tuple:
+    """
+    Open a file and read up to COPY_BUFFER_SIZE bytes from its start.
+
+    Args:
+        file_path (str): The path of the file to read.
+
+    Returns:
+        tuple: The bytes read, and the still open unbuffered file if the end was not reached yet, None otherwise.
+    """
+    in_file = open(file_path, 'rb', buffering=0)
+    try:
+        # Each file is read once front to back, so ask for aggressive read-ahead
+        fadvise(in_file.fileno(), FADVISE_SEQUENTIAL)
+        # A short read does not mean end of file (e.g. on FUSE, network filesystems or procfs), only
+        # an empty one does. Keep reading until the buffer is full or the end is reached.
+        head = bytearray()
+        while len(head) < COPY_BUFFER_SIZE:
+            chunk = in_file.read(COPY_BUFFER_SIZE - len(head))
+            if not chunk:
+                # Never read again, so its cached pages can be dropped
+                fadvise(in_file.fileno(), FADVISE_DONTNEED)
+                in_file.close()
+                return head, None
+            head += chunk
+    except BaseException:
+        in_file.close()
+        raise
+    return head, in_file
+
+def copy_file_contents(in_file, output_file, buffer: bytearray) -> None:
+    """
+    Copy the remaining contents of an input file to the output file.
+
+    The bytes are moved inside the kernel with os.copy_file_range() or os.sendfile() where possible,
+    falling back to a regular buffered copy if neither is available or supported for these files.
+
+    Args:
+        in_file (file object): The unbuffered binary input file.
+        output_file (file object): The buffered binary output file object to write to.
+        buffer (bytearray): Scratch buffer for the buffered copy, reused across files.
+    """
+    # The kernel copies from fd to fd, so anything still buffered has to be written out first.
+    # Both copies advance the file offsets, so a fallback after a partial copy resumes correctly.
+    output_file.flush()
+    in_fd, out_fd = in_file.fileno(), output_file.fileno()
+    if hasattr(os, 'copy_file_range'):
+        try:
+            while os.copy_file_range(in_fd, out_fd, KERNEL_COPY_SIZE):
+                pass
+            return
+        except OSError as e:
+            if e.errno not in KERNEL_COPY_UNSUPPORTED_ERRORS:
+                raise
+    if hasattr(os, 'sendfile'):
+        try:
+            while os.sendfile(out_fd, in_fd, None, KERNEL_COPY_SIZE):
+                pass
+            return
+        except OSError as e:
+            if e.errno not in KERNEL_COPY_UNSUPPORTED_ERRORS:
+                raise
+    # Read into the same buffer every time rather than allocating a new bytes object per chunk
+    view = memoryview(buffer)
+    while True:
+        n = in_file.readinto(buffer)
+        if not n:
+            break
+        output_file.write(view[:n])
+
+def collect_files(root_path: str, rules: IgnoreRules, output_paths: frozenset) -> list:
+    """
+    Recursively collect the files under root_path, respecting ignore patterns.
+
+    Args:
+        root_path (str): The absolute root directory to start traversal.
+        rules (IgnoreRules): The ignore patterns, see compile_ignore_patterns().
+        output_paths (frozenset): The absolute paths of the output file and its temporary file, which are skipped.
+
+    Returns:
+        list: (absolute path, relative path) tuples, in the order the files should be written.
+    """
+    files = []
+    # Iterative depth-first traversal. Using os.scandir() directly keeps the DirEntry objects, whose
+    # cached file type saves a stat() per entry compared to os.walk().
+    # Each stack entry carries its path relative to the root (as a prefix for its children, so relative
+    # paths are a single concatenation), and the by_top_dir patterns of its top level directory. Every
+    # path below it shares that directory, so the lookup is done once per top level entry.
+    stack = [(root_path, '', None)]
+    while stack:
+        dir_path, relative_prefix, prefixed = stack.pop()
+        try:
+            with os.scandir(dir_path) as it:
+                entries = list(it)
+        except OSError as e:
+            # Unreadable directories are skipped, same as os.walk
+            logging.warning(f"Error reading directory '{dir_path}': {e}")
+            continue
+        at_root = not relative_prefix
+        subdirs = []
+        for entry in entries:
+            # Always ignore .git directories (and .git files of submodules). Anything below one is never
+            # descended into, so checking the entry name alone is enough.
+            if entry.name in ALWAYS_IGNORE:
+                continue
+            relative_path = relative_prefix + entry.name
+            if at_root:
+                prefixed = rules.by_top_dir.get(os.path.normcase(entry.name))
+            # Not following symlinks lets the type come straight from the directory listing. Symlinked
+            # directories are not descended into (same as os.walk) and fail is_file() below.
+            if entry.is_dir(follow_symlinks=False):
+                # Ignored directories are never descended into, so nothing below them is tested against any pattern
+                if not should_ignore(entry.path, relative_path, rules, prefixed, output_paths):
+                    subdirs.append((entry.path, relative_path + os.sep, prefixed))
+                continue
+            if entry.is_file() and not should_ignore(entry.path, relative_path, rules, prefixed, output_paths):
+                files.append((entry.path, relative_path))
+        # Push in reverse so subdirectories are visited in listing order
+        stack.extend(reversed(subdirs))
+    return files
+
+def read_ahead_threads(files: list) -> Iterator[tuple]:
+    """
+    Read the start of each file on a thread pool, ahead of the caller consuming them.
+
+    Args:
+        files (list): (absolute path, relative path) tuples, see collect_files().
+
+    Yields:
+        tuple: The relative path, followed by the two values returned by read_file_head().
+    """
+    files = iter(files)
+
+    # Worker threads open and read the start of upcoming files while the caller writes, so the reads
+    # overlap. Results are yielded in submission order, which keeps the output deterministic, and the
+    # read-ahead is bounded so memory and open files stay limited on large trees.
+    with ThreadPoolExecutor(max_workers=READ_WORKERS) as executor:
+        pending = deque((relative_path, executor.submit(read_file_head, file_path))
+                        for file_path, relative_path in islice(files, READ_AHEAD_MAX))
+        try:
+            while pending:
+                relative_path, future = pending.popleft()
+                next_file = next(files, None)
+                if next_file:
+                    pending.append((next_file[1], executor.submit(read_file_head, next_file[0])))
+                yield (relative_path, *future.result())
+        finally:
+            # Close files read ahead but never written, e.g. after a failed read
+            for _, future in pending:
+                if not future.cancel() and future.exception() is None:
+                    in_file = future.result()[1]
+                    if in_file:
+                        in_file.close()
+
+def io_uring_run(ring, cqe, operations: list) -> list:
+    """
+    Submit one io_uring operation per entry and wait until all of them have completed.
+
+    Args:
+        ring (liburing.Ring): The initialized ring.
+        cqe (liburing.Cqe): Completion entry storage to reuse.
+        operations (list): (prep function, *arguments) tuples, e.g. (liburing.io_uring_prep_close, fd).
+
+    Returns:
+        list: The result of every operation in submission order, or the OSError it failed with.
+    """
+    if not operations:
+        return []
+    for index, (prep, *arguments) in enumerate(operations):
+        sqe = liburing.io_uring_get_sqe(ring)
+        prep(sqe, *arguments)
+        sqe.user_data = index
+    liburing.io_uring_submit_and_wait(ring, len(operations))
+
+    # Completions arrive in any order, user_data maps them back to their operation
+    results = [None] * len(operations)
+    for _ in operations:
+        liburing.io_uring_wait_cqe(ring, cqe)
+        entry = cqe[0]
+        try:
+            results[entry.user_data] = entry.res
+        except OSError as e:
+            results[entry.user_data] = e
+        liburing.io_uring_cqe_seen(ring, entry)
+    return results
+
+def io_uring_check(batch: list, fds: list, results: list) -> None:
+    """
+    Raise the first failed operation of a batch for its file, closing every file of the batch that was opened.
+
+    Args:
+        batch (list): (absolute path, relative path) tuples of the batch.
+        fds (list): The results of opening the batch, see io_uring_run().
+        results (list): The results to check, in the same order as batch.
+    """
+    for (path, _), result in zip(batch, results):
+        if isinstance(result, OSError):
+            for fd in fds:
+                if not isinstance(fd, OSError):
+                    os.close(fd)
+            # Same as a failing open() or read() in the threaded path
+            raise OSError(result.errno, result.strerror, path)
+
+def io_uring_path_supported(path: str) -> bool:
+    """
+    Check whether a path can be passed to liburing, which only accepts paths that encode as strict UTF-8.
+
+    Args:
+        path (str): The absolute path to the file.
+
+    Returns:
+        bool: True if the file can be opened through io_uring.
+    """
+    try:
+        path.encode('utf-8')
+    except UnicodeEncodeError:
+        return False
+    return True
+
+def read_ahead_io_uring(files: list) -> Iterator[tuple]:
+    """
+    Read the start of each file with io_uring, submitting the calls for IO_URING_BATCH_SIZE files at once.
+
+    Falls back to read_ahead_threads() if liburing is not installed or io_uring is not available, and to
+    read_file_head() for paths liburing cannot take, see io_uring_path_supported().
+
+    Args:
+        files (list): (absolute path, relative path) tuples, see collect_files().
+
+    Yields:
+        tuple: The relative path, followed by the same two values read_file_head() returns.
+    """
+    if not liburing:
+        logging.warning("liburing is not installed, reading files with threads instead.")
+        yield from read_ahead_threads(files)
+        return
+    ring, cqe = liburing.Ring(), liburing.Cqe()
+    try:
+        liburing.io_uring_queue_init(IO_URING_BATCH_SIZE, ring)
+    except OSError as e:
+        logging.warning(f"io_uring is not available, reading files with threads instead: {e}")
+        yield from read_ahead_threads(files)
+        return
+
+    try:
+        for start in range(0, len(files), IO_URING_BATCH_SIZE):
+            batch_files = files[start:start + IO_URING_BATCH_SIZE]
+            # liburing only takes str paths and encodes them as strict UTF-8, so names that are not
+            # valid UTF-8 (undecodable bytes kept as surrogates) are read synchronously instead
+            on_ring = [io_uring_path_supported(path) for path, _ in batch_files]
+            batch   = [entry for entry, supported in zip(batch_files, on_ring) if supported]
+            fds     = io_uring_run(ring, cqe, [(liburing.io_uring_prep_open, path, liburing.O_RDONLY) for path, _ in batch])
+            io_uring_check(batch, fds, fds)
+            # Same read-ahead hint as read_file_head(), submitted for the whole batch at once
+            if FADVISE_SEQUENTIAL is not None:
+                io_uring_run(ring, cqe, [(liburing.io_uring_prep_fadvise, fd, 0, FADVISE_SEQUENTIAL, 0) for fd in fds])
+
+            # Reads may return short counts without being at the end of the file, only an empty read
+            # means that. Keep reading until each file filled its buffer or reached its end.
+            heads   = [bytearray() for _ in batch]
+            at_end  = [False] * len(batch)
+            reading = list(range(len(batch)))
+            while reading:
+                buffers = [bytearray(COPY_BUFFER_SIZE - len(heads[i])) for i in reading]
+                sizes   = io_uring_run(ring, cqe, [(liburing.io_uring_prep_read, fds[i], buffer, len(heads[i]))
+                                                   for i, buffer in zip(reading, buffers)])
+                io_uring_check([batch[i] for i in reading], fds, sizes)
+                unfinished = []
+                for i, buffer, size in zip(reading, buffers, sizes):
+                    if not size:
+                        at_end[i] = True
+                        continue
+                    heads[i] += memoryview(buffer)[:size]
+                    if len(heads[i]) < COPY_BUFFER_SIZE:
+                        unfinished.append(i)
+                reading = unfinished
+
+            # Files read completely are closed right away, the others are handed over to be streamed
+            finished = [fd for fd, end in zip(fds, at_end) if end]
+            if FADVISE_DONTNEED is not None:
+                io_uring_run(ring, cqe, [(liburing.io_uring_prep_fadvise, fd, 0, FADVISE_DONTNEED, 0) for fd in finished])
+            io_uring_run(ring, cqe, [(liburing.io_uring_prep_close, fd) for fd in finished])
+            ready = []
+            for (_, relative_path), fd, head, end in zip(batch, fds, heads, at_end):
+                in_file = None
+                if not end:
+                    # The reads were positional, so move the file offset past what was already read
+                    in_file = open(fd, 'rb', buffering=0)
+                    in_file.seek(len(head))
+                ready.append((relative_path, head, in_file))
+            # Yield in the original order, reading the files left out of the ring in between
+            ready = iter(ready)
+            for (path, relative_path), supported in zip(batch_files, on_ring):
+                yield next(ready) if supported else (relative_path, *read_file_head(path))
+    finally:
+        liburing.io_uring_queue_exit(ring)
+
+def write_files_recursively(root_path: str, output_file, rules: IgnoreRules, output_paths: frozenset, use_io_uring: bool = False) -> None:
     """
     Recursively write files from the root_path to the output_file, respecting ignore patterns.
 
     Args:
-        root_path (str): The root directory to start traversal.
-        output_file (file object): The output file object to write to.
-        ignore_patterns (list): A list of glob patterns to ignore.
-        output_file_path (str): The path to the output file.
-    """
-    for root, dirs, files in os.walk(root_path):
-        # Filter directories
-        dirs[:] = [d for d in dirs if not should_ignore(os.path.join(root, d), ignore_patterns, output_file_path, root_path)]
-        for file in files:
-            file_path = os.path.join(root, file)
-            if should_ignore(file_path, ignore_patterns, output_file_path, root_path):
+        root_path (str): The absolute root directory to start traversal.
+        output_file (file object): The binary output file object to write to.
+        rules (IgnoreRules): The ignore patterns, see compile_ignore_patterns().
+        output_paths (frozenset): The absolute paths of the output file and its temporary file, which are skipped.
+        use_io_uring (bool): Read files with io_uring instead of a thread pool.
+    """
+    files  = collect_files(root_path, rules, output_paths)
+    buffer = bytearray(COPY_BUFFER_SIZE)
+    reader = read_ahead_io_uring(files) if use_io_uring else read_ahead_threads(files)
+
+    with closing(reader):
+        for relative_path, head, in_file in reader:
+            # File contents are copied as raw bytes, only the header needs encoding
+            header = f"// file: {relative_path}:\n".encode('utf-8', errors='replace')
+            if not in_file:
+                # The whole file was read ahead, so it goes out in a single call
+                output_file.writelines((header, head, b'\n\n'))
                 continue
-            relative_path = os.path.relpath(file_path, root_path)
-            output_file.write(f"// file: {relative_path}:\n")
-            try:
-                with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
-                    output_file.write(f.read())
-            except UnicodeDecodeError as e:
-                logging.error(f"Error reading file '{file}': {e}")
-            output_file.write('\n\n')
+            # Larger files are streamed from where the read-ahead stopped
+            output_file.writelines((header, head))
+            with in_file:
+                copy_file_contents(in_file, output_file, buffer)
+                fadvise(in_file.fileno(), FADVISE_DONTNEED)
+            output_file.write(b'\n\n')
+
+def create_temp_output(output_path: str) -> tuple:
+    """
+    Create a uniquely named temporary file next to the output, to be renamed over it once written.
+
+    Args:
+        output_path (str): The absolute path to the output file.
+
+    Returns:
+        tuple: The open file descriptor and the absolute path of the temporary file.
+    """
+    try:
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(output_path), prefix=os.path.basename(output_path) + '.', suffix='.tmp')
+    except OSError as e:
+        # Report the failure against the output the user asked for, not the random temporary name
+        raise OSError(e.errno, e.strerror, output_path) from e
+    # mkstemp() creates the file as 0600. Give it the mode of the file it replaces, or the mode
+    # open() would have created it with.
+    if hasattr(os, 'fchmod'):
+        if os.path.exists(output_path):
+            mode = stat.S_IMODE(os.stat(output_path).st_mode)
+        else:
+            umask = os.umask(0)
+            os.umask(umask)
+            mode = 0o666 & ~umask
+        try:
+            os.fchmod(fd, mode)
+        except BaseException:
+            os.close(fd)
+            os.unlink(temp_path)
+            raise
+    return fd, temp_path
 
 def main():
     args = parse_args()
@@ -103,22 +569,47 @@ def main():
     ignore_patterns = []
     if ignore_file_path and os.path.isfile(ignore_file_path):
         with open(ignore_file_path, 'r', encoding='utf-8', errors='replace') as f:
-            for line in f:
-                line = line.strip()
-                if not line or line.startswith('#'):
-                    continue
-                ignore_patterns.append(line)
+            # Skip blank lines and comments
+            ignore_patterns = [s for s in map(str.strip, f) if s and not s.startswith('#')]
     else:
         logging.info("No ignore patterns loaded.")
+    rules = compile_ignore_patterns(ignore_patterns)
 
+    # Normalize paths once here so the per-entry checks can compare them directly
+    output_abs = os.path.abspath(output_path)
+    root_abs   = os.path.abspath(input_dir)
+
+    # Write to a temporary file next to the output and rename it into place once complete. The output
+    # is then replaced atomically and never left half written, and the filesystem sees one sequential
+    # stream of a new file rather than rewrites of an existing one. Anything that is not a regular file
+    # (e.g. /dev/stdout, or a symlink) is written to directly instead, as renaming over it would replace it.
+    write_directly = os.path.islink(output_abs) or (os.path.exists(output_abs) and not os.path.isfile(output_abs))
+    temp_abs = None
     try:
-        with open(output_path, 'w', encoding='utf-8', errors='replace') as output_file:
-            write_files_recursively(input_dir, output_file, ignore_patterns, output_path)
-        logging.info(f"Files written to {os.path.abspath(output_path)}")
+        if write_directly:
+            output_fd = os.open(output_abs, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o666)
+        else:
+            output_fd, temp_abs = create_temp_output(output_abs)
+        output_paths = frozenset(path for path in (output_abs, temp_abs) if path)
+        with open(output_fd, 'wb', buffering=OUTPUT_BUFFER_SIZE) as output_file:
+            fadvise(output_file.fileno(), FADVISE_SEQUENTIAL)
+            write_files_recursively(root_abs, output_file, rules, output_paths, args.io_uring)
+        if temp_abs:
+            os.replace(temp_abs, output_abs)
+            temp_abs = None
+        logging.info(f"Files written to {output_abs}")
 
     except Exception as ex:
         logging.critical(f"Exception thrown: {ex}")
         sys.exit(1)
 
+    finally:
+        # Remove the temporary file whenever it was not renamed into place, including on KeyboardInterrupt
+        if temp_abs:
+            try:
+                os.unlink(temp_abs)
+            except OSError:
+                pass
+
 if __name__ == "__main__":
     main()
@@ -1,11 +1,15 @@
 import os
 import sys
+import errno
 import tempfile
+import threading
+import time
 import unittest
 from unittest.mock import patch
 import logging
 
-from ingestipy.ingestipy import main
+from ingestipy import ingestipy
+from ingestipy.ingestipy import main, read_file_head
 
 class TestAppIntegration(unittest.TestCase):
 
@@ -129,9 +133,320 @@ class TestAppIntegration(unittest.TestCase):
                     output = f.read()
 
                 self.assertIn("Default input test", output)
+                # The output is written to a temporary file first, which must neither be ingested nor left behind.
+                self.assertNotIn("_ingestipy_output.txt", output)
+                self.assertEqual(sorted(os.listdir(temp_dir)), sorted(["file1.txt", os.path.basename(default_output)]))
             finally:
                 os.chdir(old_cwd)
 
+    def test_app_extension_ignore_patterns(self):
+        """
+        Test that "*.ext" ignore patterns skip matching files at any depth,
+        including dotfiles, while other glob patterns keep working alongside them.
+        """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            files = {
+                "keep.txt":          "Kept top level",
+                "drop.log":          "Dropped top level log",
+                ".log":              "Dropped dotfile log",
+                "sub/keep.py":       "Kept nested",
+                "sub/drop.log":      "Dropped nested log",
+                "sub/skip_me.txt":   "Dropped by glob",
+            }
+            for name, content in files.items():
+                file_path = os.path.join(temp_dir, *name.split("/"))
+                os.makedirs(os.path.dirname(file_path), exist_ok=True)
+                with open(file_path, "w", encoding="utf-8") as f:
+                    f.write(content)
+
+            ignore_file_path = os.path.join(temp_dir, "ignore.txt")
+            with open(ignore_file_path, "w", encoding="utf-8") as f:
+                f.write("*.log\n*skip_me*\nignore.txt\n")
+
+            output_file_path = os.path.join(temp_dir, "output.txt")
+            test_args = [
+                "prog",
+                "-in", temp_dir,
+                "-out", output_file_path,
+                "-ignore", ignore_file_path,
+            ]
+
+            with patch.object(sys, 'argv', test_args):
+                main()
+
+            with open(output_file_path, "r", encoding="utf-8") as f:
+                output = f.read()
+
+            self.assertIn("Kept top level", output)
+            self.assertIn("Kept nested", output)
+            self.assertNotIn("Dropped", output)
+
+    def test_app_copies_file_bytes_verbatim(self):
+        """
+        Test that file contents are copied byte for byte, including line endings
+        and bytes that are not valid UTF-8.
+        """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            content = b"caf\xe9\r\nsecond line\r\n\x00\xff"
+            with open(os.path.join(temp_dir, "data.bin"), "wb") as f:
+                f.write(content)
+
+            output_file_path = os.path.join(temp_dir, "output.txt")
+            test_args = [
+                "prog",
+                "-in", temp_dir,
+                "-out", output_file_path,
+            ]
+
+            with patch.object(sys, 'argv', test_args):
+                main()
+
+            with open(output_file_path, "rb") as f:
+                output = f.read()
+
+            self.assertEqual(output, b"// file: data.bin:\n" + content + b"\n\n")
+
+    def test_app_large_file_output(self):
+        """
+        Test that files larger than one copy chunk are copied completely and in order,
+        both with the in-kernel copy and when falling back from it.
+        """
+        def unsupported(*args):
+            raise OSError(errno.EXDEV, "Invalid cross-device link")
+
+        fallbacks = {
+            "default":       {},
+            "sendfile":      {"copy_file_range": unsupported},
+            "buffered copy": {"copy_file_range": unsupported, "sendfile": unsupported},
+        }
+        for name, replacements in fallbacks.items():
+            with self.subTest(name), tempfile.TemporaryDirectory() as temp_dir:
+                large = bytes(range(256)) * 1200
+                small = b"Small file after the large one"
+                with open(os.path.join(temp_dir, "large.bin"), "wb") as f:
+                    f.write(large)
+                os.mkdir(os.path.join(temp_dir, "sub"))
+                with open(os.path.join(temp_dir, "sub", "small.txt"), "wb") as f:
+                    f.write(small)
+
+                output_file_path = os.path.join(temp_dir, "output.txt")
+                test_args = [
+                    "prog",
+                    "-in", temp_dir,
+                    "-out", output_file_path,
+                ]
+
+                with patch.object(sys, 'argv', test_args), \
+                     patch.dict(vars(os), replacements):
+                    main()
+
+                with open(output_file_path, "rb") as f:
+                    output = f.read()
+
+                expected = (
+                    b"// file: large.bin:\n" + large + b"\n\n" +
+                    f"// file: {os.path.join('sub', 'small.txt')}:\n".encode() + small + b"\n\n"
+                )
+                self.assertEqual(output, expected)
+
+    def test_app_io_uring_output(self):
+        """
+        Test that reading files with --io_uring produces the same output as the default mode,
+        whether io_uring is used or the app falls back to threads because it is unavailable.
+        """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_dir = os.path.join(temp_dir, "input")
+            for index in range(40):
+                sub_dir = os.path.join(input_dir, f"dir{index % 3}")
+                os.makedirs(sub_dir, exist_ok=True)
+                with open(os.path.join(sub_dir, f"file{index}.txt"), "wb") as f:
+                    f.write(f"File {index}\n".encode() * (index * 500))
+
+            outputs = []
+            for extra_args in ([], ["--io_uring"]):
+                output_file_path = os.path.join(temp_dir, f"output{len(outputs)}.txt")
+                test_args = [
+                    "prog",
+                    "-in", input_dir,
+                    "-out", output_file_path,
+                ] + extra_args
+
+                with patch.object(sys, 'argv', test_args):
+                    main()
+
+                with open(output_file_path, "rb") as f:
+                    outputs.append(f.read())
+
+            self.assertIn(b"// file: " + os.path.join("dir1", "file1.txt").encode() + b":\n", outputs[0])
+            self.assertEqual(outputs[0], outputs[1])
+
+    @unittest.skipUnless(ingestipy.liburing, "needs liburing")
+    @unittest.skipUnless(sys.getfilesystemencodeerrors() == "surrogateescape", "needs os.fsencode() of undecodable names")
+    def test_app_io_uring_non_utf8_names(self):
+        """
+        Test that files whose names are not valid UTF-8, which liburing cannot open, are read
+        synchronously with --io_uring and give the same output as the default mode.
+        """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_dir = os.path.join(temp_dir, "input")
+            os.mkdir(input_dir)
+            for name in (b"a.txt", b"\xffbad.txt", b"z.txt"):
+                try:
+                    with open(os.path.join(os.fsencode(input_dir), name), "wb") as f:
+                        f.write(b"Contents of " + name)
+                except OSError:
+                    self.skipTest("filesystem does not accept non-UTF-8 names")
+
+            outputs = []
+            for extra_args in ([], ["--io_uring"]):
+                output_file_path = os.path.join(temp_dir, f"output{len(outputs)}.txt")
+                test_args = [
+                    "prog",
+                    "-in", input_dir,
+                    "-out", output_file_path,
+                ] + extra_args
+
+                with patch.object(sys, 'argv', test_args):
+                    main()
+
+                with open(output_file_path, "rb") as f:
+                    outputs.append(f.read())
+
+            self.assertIn(b"Contents of \xffbad.txt", outputs[0])
+            self.assertEqual(outputs[0], outputs[1])
+
+    @unittest.skipUnless(hasattr(os, "mkfifo"), "needs os.mkfifo")
+    def test_read_file_head_short_reads(self):
+        """
+        Test that a short read is not mistaken for the end of the file. A FIFO whose writer
+        sends the data in pieces returns one piece per read.
+        """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            fifo_path = os.path.join(temp_dir, "fifo")
+            os.mkfifo(fifo_path)
+            pieces = [b"first piece\n", b"second piece\n", b"third piece\n"]
+
+            def write_pieces():
+                with open(fifo_path, "wb", buffering=0) as f:
+                    for piece in pieces:
+                        f.write(piece)
+                        time.sleep(0.05)
+
+            writer = threading.Thread(target=write_pieces)
+            writer.start()
+            try:
+                head, in_file = read_file_head(fifo_path)
+            finally:
+                writer.join()
+
+            self.assertEqual(bytes(head), b"".join(pieces))
+            self.assertIsNone(in_file)
+
+    @unittest.skipUnless(ingestipy.liburing, "needs liburing")
+    def test_read_ahead_io_uring_short_reads(self):
+        """
+        Test that io_uring reads returning short counts are continued rather than taken as
+        the end of the file, by capping every read result to a few bytes.
+        """
+        run = ingestipy.io_uring_run
+
+        def short_reads(ring, cqe, operations):
+            results = run(ring, cqe, operations)
+            if operations and operations[0][0] is ingestipy.liburing.io_uring_prep_read:
+                results = [min(result, 7) if isinstance(result, int) else result for result in results]
+            return results
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            contents = {"small.txt": b"Small file, read in pieces", "large.bin": bytes(range(256)) * 300}
+            files = []
+            for name, content in contents.items():
+                file_path = os.path.join(temp_dir, name)
+                with open(file_path, "wb") as f:
+                    f.write(content)
+                files.append((file_path, name))
+
+            with patch.object(ingestipy, "io_uring_run", short_reads):
+                results = list(ingestipy.read_ahead_io_uring(files))
+
+            for relative_path, head, in_file in results:
+                data = bytes(head)
+                if in_file:
+                    with in_file:
+                        data += in_file.read()
+                self.assertEqual(data, contents[relative_path])
+
+    def test_app_keeps_files_named_like_temp_output(self):
+        """
+        Test that a file named like the output's temporary file is neither overwritten,
+        removed nor skipped, since the temporary file gets a unique name.
+        """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_file_path = os.path.join(temp_dir, "output.txt")
+            notes_path = output_file_path + ".tmp"
+            with open(notes_path, "w", encoding="utf-8") as f:
+                f.write("Precious notes")
+
+            test_args = [
+                "prog",
+                "-in", temp_dir,
+                "-out", output_file_path,
+            ]
+
+            with patch.object(sys, 'argv', test_args):
+                main()
+
+            with open(notes_path, "r", encoding="utf-8") as f:
+                self.assertEqual(f.read(), "Precious notes")
+            with open(output_file_path, "r", encoding="utf-8") as f:
+                self.assertIn("// file: output.txt.tmp:\nPrecious notes", f.read())
+            self.assertEqual(sorted(os.listdir(temp_dir)), ["output.txt", "output.txt.tmp"])
+
+    def test_app_interrupt_removes_temp_output(self):
+        """
+        Test that the temporary output file is removed when the run is interrupted,
+        and that an existing output file is left untouched.
+        """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_file_path = os.path.join(temp_dir, "output.txt")
+            with open(output_file_path, "w", encoding="utf-8") as f:
+                f.write("Previous output")
+
+            test_args = [
+                "prog",
+                "-in", temp_dir,
+                "-out", output_file_path,
+            ]
+
+            with patch.object(sys, 'argv', test_args), \
+                 patch.object(ingestipy, "write_files_recursively", side_effect=KeyboardInterrupt):
+                with self.assertRaises(KeyboardInterrupt):
+                    main()
+
+            self.assertEqual(os.listdir(temp_dir), ["output.txt"])
+            with open(output_file_path, "r", encoding="utf-8") as f:
+                self.assertEqual(f.read(), "Previous output")
+
+    def test_app_missing_output_dir_names_output(self):
+        """
+        Test that failing to create the output's temporary file, here because the output
+        directory does not exist, is reported against the output path given with -out.
+        """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_file_path = os.path.join(temp_dir, "missing_dir", "output.txt")
+            test_args = [
+                "prog",
+                "-in", temp_dir,
+                "-out", output_file_path,
+            ]
+
+            with patch.object(sys, 'argv', test_args):
+                with self.assertLogs(level="CRITICAL") as logs:
+                    with self.assertRaises(SystemExit) as cm:
+                        main()
+                self.assertEqual(cm.exception.code, 1)
+            self.assertIn(repr(output_file_path), logs.output[0])
+            self.assertNotIn(".tmp", logs.output[0])
+
     def test_app_exception_handling(self):
         """
         Test that the app properly handles exceptions during file writing.
@@ -159,6 +474,7 @@ class TestAppIntegration(unittest.TestCase):
                 with self.assertRaises(SystemExit) as cm:
                     main()
                 self.assertEqual(cm.exception.code, 1)
+            self.assertEqual(sorted(os.listdir(temp_dir)), ["file1.txt", "output_dir"])
 
 if __name__ == '__main__':
     unittest.main()